@@ -0,0 +1,384 @@
+# Human 2.0 Assessment Bot - Assessment Storage
+# Created for DrewIs.. UpLevel Movement Business
+# Persists completed assessments so repeat check-ins can be tracked over time
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+DEFAULT_DB_PATH = os.environ.get("HUMAN20_DB_PATH", "human20_assessments.db")
+
+# Domain scores followed by the subcategory scores produced by calculate_scores.
+# Each one is a column of the history table, stored as integer tenths of a point
+# so a check-in takes a couple of bytes per score instead of an 8-byte REAL.
+DOMAIN_COLUMNS = ["overall", "biological", "mental", "financial"]
+SUBCATEGORY_COLUMNS = [
+    "sleep_quality",
+    "energy_levels",
+    "stress_recovery",
+    "nutrition_fitness",
+    "cognitive_performance",
+    "emotional_intelligence",
+    "mindset_resilience",
+    "wealth_building",
+    "financial_stability",
+    "investment_intelligence",
+    "money_mindset"
+]
+SCORE_COLUMNS = DOMAIN_COLUMNS + SUBCATEGORY_COLUMNS
+
+# Participant fields the coach dashboard breaks scores down by, and the
+# multiselect answers whose selections it counts
+PROFILE_DIMENSIONS = ["age", "occupation", "primary_goal"]
+BELIEF_FIELDS = {"limiting_beliefs": "mental", "wealth_beliefs": "financial"}
+
+# Width of the score bins kept for distribution charts
+HISTOGRAM_BIN_WIDTH = 10
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address so repeat assessments link to the same person"""
+    return (email or "").strip().lower()
+
+
+def normalize_bucket(value: str) -> str:
+    """Normalize a free-text profile answer into an aggregate bucket"""
+    value = " ".join((value or "").split())
+    return value.title() if value else "Not specified"
+
+
+class AssessmentStore:
+    """
+    SQLite-backed store for completed assessments.
+
+    The history table is keyed on (email, taken_at) and declared WITHOUT ROWID,
+    so each participant's check-ins sit together in primary-key order and a
+    full history is read with a single index range scan.
+
+    Coach analytics are kept as running totals that are updated in the same
+    transaction as each stored submission, so reading them costs the same no
+    matter how many submissions have been stored.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Open (and if needed create) the assessment database
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the tables used by the store"""
+        score_columns = ",\n".join(f"    {column} INTEGER NOT NULL" for column in SCORE_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+CREATE TABLE IF NOT EXISTS assessment_history (
+    email TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+{score_columns},
+    PRIMARY KEY (email, taken_at)
+) WITHOUT ROWID
+""")
+            self._conn.execute("""
+CREATE TABLE IF NOT EXISTS report_details (
+    email TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    ai_analysis TEXT NOT NULL,
+    opportunities TEXT NOT NULL,
+    business_profile TEXT NOT NULL,
+    PRIMARY KEY (email, taken_at)
+) WITHOUT ROWID
+""")
+            self._conn.execute("""
+CREATE TABLE IF NOT EXISTS funnel_steps (
+    step TEXT PRIMARY KEY,
+    sessions INTEGER NOT NULL
+) WITHOUT ROWID
+""")
+            self._conn.execute("""
+CREATE TABLE IF NOT EXISTS score_aggregates (
+    dimension TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    submissions INTEGER NOT NULL,
+    overall_sum REAL NOT NULL,
+    biological_sum REAL NOT NULL,
+    mental_sum REAL NOT NULL,
+    financial_sum REAL NOT NULL,
+    PRIMARY KEY (dimension, bucket)
+) WITHOUT ROWID
+""")
+            # Free-text occupations give one bucket per distinct answer, so the
+            # dashboard's top-N read walks this index instead of sorting them all
+            self._conn.execute("""
+CREATE INDEX IF NOT EXISTS score_aggregates_by_submissions
+ON score_aggregates (dimension, submissions DESC)
+""")
+            self._conn.execute("""
+CREATE TABLE IF NOT EXISTS score_histogram (
+    dimension TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    score_bin INTEGER NOT NULL,
+    submissions INTEGER NOT NULL,
+    PRIMARY KEY (dimension, bucket, score_bin)
+) WITHOUT ROWID
+""")
+            self._conn.execute("""
+CREATE TABLE IF NOT EXISTS belief_counts (
+    field TEXT NOT NULL,
+    belief TEXT NOT NULL,
+    submissions INTEGER NOT NULL,
+    PRIMARY KEY (field, belief)
+) WITHOUT ROWID
+""")
+
+    def save_submission(self, assessment_data: Dict[str, Any], scores: Dict[str, Any],
+                        taken_at: Optional[int] = None) -> int:
+        """
+        Record a completed assessment and fold it into the coach analytics
+
+        Args:
+            assessment_data: Collected answers; 'email' links repeat assessments
+            scores: Score dictionary returned by calculate_scores
+            taken_at: Unix timestamp of the check-in (defaults to now)
+
+        Returns:
+            The timestamp the check-in was stored under
+        """
+        taken_at = int(taken_at if taken_at is not None else time.time())
+        values = [round(float(scores[column]) * 10) for column in DOMAIN_COLUMNS]
+        values += [round(float(scores['subcategories'][column]) * 10) for column in SUBCATEGORY_COLUMNS]
+
+        email = normalize_email(assessment_data['email'])
+        placeholders = ", ".join("?" for _ in range(len(SCORE_COLUMNS) + 2))
+        with self._lock, self._conn:
+            # A check-in that collides with an existing one for the same email is
+            # moved to the next free second so every submission keeps its own row
+            while self._conn.execute(
+                "SELECT 1 FROM assessment_history WHERE email = ? AND taken_at = ?",
+                [email, taken_at]
+            ).fetchone():
+                taken_at += 1
+            self._conn.execute(
+                f"INSERT INTO assessment_history (email, taken_at, {', '.join(SCORE_COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                [email, taken_at] + values
+            )
+            self._update_aggregates(assessment_data, scores)
+        return taken_at
+
+    def _update_aggregates(self, assessment_data: Dict[str, Any], scores: Dict[str, Any]):
+        """Add one submission to the running analytics totals (caller holds the transaction)"""
+        score_bin = min(int(scores['overall'] // HISTOGRAM_BIN_WIDTH), 100 // HISTOGRAM_BIN_WIDTH - 1)
+        buckets = [("all", "All participants")]
+        buckets += [(dimension, normalize_bucket(assessment_data.get(dimension, ""))) for dimension in PROFILE_DIMENSIONS]
+
+        self._conn.executemany("""
+INSERT INTO score_aggregates (dimension, bucket, submissions, overall_sum, biological_sum, mental_sum, financial_sum)
+VALUES (?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (dimension, bucket) DO UPDATE SET
+    submissions = submissions + 1,
+    overall_sum = overall_sum + excluded.overall_sum,
+    biological_sum = biological_sum + excluded.biological_sum,
+    mental_sum = mental_sum + excluded.mental_sum,
+    financial_sum = financial_sum + excluded.financial_sum
+""", [(dimension, bucket, scores['overall'], scores['biological'], scores['mental'], scores['financial'])
+      for dimension, bucket in buckets])
+
+        self._conn.executemany("""
+INSERT INTO score_histogram (dimension, bucket, score_bin, submissions) VALUES (?, ?, ?, 1)
+ON CONFLICT (dimension, bucket, score_bin) DO UPDATE SET submissions = submissions + 1
+""", [(dimension, bucket, score_bin) for dimension, bucket in buckets])
+
+        beliefs = [(field, belief)
+                   for field, domain in BELIEF_FIELDS.items()
+                   for belief in assessment_data.get(domain, {}).get(field, [])]
+        self._conn.executemany("""
+INSERT INTO belief_counts (field, belief, submissions) VALUES (?, ?, 1)
+ON CONFLICT (field, belief) DO UPDATE SET submissions = submissions + 1
+""", beliefs)
+
+    def save_report_details(self, assessment_data: Dict[str, Any], taken_at: int, ai_analysis: str,
+                            opportunities: List[Dict[str, Any]], business_profile: Dict[str, str]):
+        """
+        Keep what the Complete Report needs beyond the stored scores
+
+        Args:
+            assessment_data: Collected answers (name and email are used)
+            taken_at: Timestamp returned by save_submission
+            ai_analysis: AI analysis shown on the results page
+            opportunities: Ranked opportunities from find_top_opportunities
+            business_profile: Branding to print on the report
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_details VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    normalize_email(assessment_data['email']), taken_at,
+                    assessment_data.get('first_name', ''), assessment_data.get('last_name', ''),
+                    ai_analysis, json.dumps(opportunities), json.dumps(business_profile)
+                ]
+            )
+
+    def load_submission(self, email: str, taken_at: int) -> Optional[Dict[str, Any]]:
+        """
+        Load everything needed to render one Complete Report
+
+        Returns:
+            Submission dictionary, or None if no report details were stored
+        """
+        with self._lock:
+            row = self._conn.execute(f"""
+SELECT d.first_name, d.last_name, d.ai_analysis, d.opportunities, d.business_profile, {", ".join("h." + column for column in SCORE_COLUMNS)}
+FROM report_details d JOIN assessment_history h USING (email, taken_at)
+WHERE d.email = ? AND d.taken_at = ?
+""", [normalize_email(email), taken_at]).fetchone()
+        if row is None:
+            return None
+
+        first_name, last_name, ai_analysis, opportunities, business_profile = row[:5]
+        values = dict(zip(SCORE_COLUMNS, (value / 10 for value in row[5:])))
+        scores: Dict[str, Any] = {column: values[column] for column in DOMAIN_COLUMNS}
+        scores['subcategories'] = {column: values[column] for column in SUBCATEGORY_COLUMNS}
+
+        return {
+            "email": normalize_email(email),
+            "taken_at": taken_at,
+            "first_name": first_name,
+            "last_name": last_name,
+            "scores": scores,
+            "opportunities": json.loads(opportunities),
+            "ai_analysis": ai_analysis,
+            "business_profile": json.loads(business_profile)
+        }
+
+    def iter_report_keys(self, since: int = 0, batch_size: int = 1000):
+        """
+        Yield (email, taken_at) for every stored report taken at or after `since`
+
+        Keys are read in pages so a bulk run never holds the whole table in memory.
+        """
+        last_key = ("", -1)
+        while True:
+            with self._lock:
+                page = self._conn.execute("""
+SELECT email, taken_at FROM report_details
+WHERE taken_at >= ? AND (email, taken_at) > (?, ?)
+ORDER BY email, taken_at LIMIT ?
+""", [since, last_key[0], last_key[1], batch_size]).fetchall()
+            if not page:
+                return
+            yield from page
+            last_key = page[-1]
+
+    def record_step(self, step: str):
+        """Count a session reaching an assessment step"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+INSERT INTO funnel_steps (step, sessions) VALUES (?, 1)
+ON CONFLICT (step) DO UPDATE SET sessions = sessions + 1
+""", [step])
+
+    def load_history(self, email: str, limit: Optional[int] = None,
+                     taken_at: Optional[List[int]] = None) -> Dict[str, List[Any]]:
+        """
+        Load a participant's check-ins, oldest first
+
+        Args:
+            email: Participant email address
+            limit: Only return the most recent `limit` check-ins
+            taken_at: Only return check-ins stored under these timestamps
+
+        Returns:
+            Column-oriented history: 'taken_at' plus one list per score column
+        """
+        params: List[Any] = [normalize_email(email)]
+        query = f"SELECT taken_at, {', '.join(SCORE_COLUMNS)} FROM assessment_history WHERE email = ?"
+        if taken_at is not None:
+            query += f" AND taken_at IN ({', '.join('?' for _ in taken_at)})"
+            params.extend(taken_at)
+        query += " ORDER BY taken_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        rows.reverse()
+
+        history: Dict[str, List[Any]] = {"taken_at": [row[0] for row in rows]}
+        for index, column in enumerate(SCORE_COLUMNS, start=1):
+            history[column] = [row[index] / 10 for row in rows]
+        return history
+
+    def load_analytics(self, max_buckets: int = 25) -> Dict[str, Any]:
+        """
+        Load the coach analytics totals
+
+        Args:
+            max_buckets: Most popular buckets to return per profile dimension
+
+        Returns:
+            Dictionary with 'funnel' ({step: sessions}), 'scores' and
+            'histogram' ({dimension: rows}) and 'beliefs' ({field: rows})
+        """
+        with self._lock:
+            funnel = dict(self._conn.execute("SELECT step, sessions FROM funnel_steps").fetchall())
+
+            scores: Dict[str, List[Dict[str, Any]]] = {}
+            histogram: Dict[str, List[Dict[str, Any]]] = {}
+            for dimension in ["all"] + PROFILE_DIMENSIONS:
+                rows = self._conn.execute("""
+SELECT bucket, submissions, overall_sum, biological_sum, mental_sum, financial_sum
+FROM score_aggregates WHERE dimension = ? ORDER BY submissions DESC LIMIT ?
+""", [dimension, max_buckets]).fetchall()
+                scores[dimension] = [
+                    {
+                        "bucket": bucket,
+                        "submissions": count,
+                        "overall": overall / count,
+                        "biological": biological / count,
+                        "mental": mental / count,
+                        "financial": financial / count
+                    }
+                    for bucket, count, overall, biological, mental, financial in rows
+                ]
+
+                bucket_names = [row["bucket"] for row in scores[dimension]]
+                histogram[dimension] = [
+                    {"bucket": bucket, "score_bin": score_bin * HISTOGRAM_BIN_WIDTH, "submissions": count}
+                    for bucket, score_bin, count in self._conn.execute(f"""
+SELECT bucket, score_bin, submissions FROM score_histogram
+WHERE dimension = ? AND bucket IN ({", ".join("?" for _ in bucket_names)})
+ORDER BY bucket, score_bin
+""", [dimension] + bucket_names).fetchall()
+                ]
+
+            beliefs = {
+                field: [
+                    {"belief": belief, "submissions": count}
+                    for belief, count in self._conn.execute(
+                        "SELECT belief, submissions FROM belief_counts WHERE field = ? ORDER BY submissions DESC",
+                        [field]
+                    ).fetchall()
+                ]
+                for field in BELIEF_FIELDS
+            }
+
+        return {"funnel": funnel, "scores": scores, "histogram": histogram, "beliefs": beliefs}
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
@@ -4,13 +4,110 @@
 # Date: June 2025
 
 import json
+import contextlib
 import datetime
+import hmac
+import os
+import uuid
 from typing import Dict, List, Any, Optional
 import openai
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from assessment_store import AssessmentStore, HISTOGRAM_BIN_WIDTH
+from report_renderer import ReportTemplate, report_filename
+from session_profiler import SessionProfiler
+
+@st.cache_resource
+def get_assessment_store() -> AssessmentStore:
+    """Shared assessment store, opened once per server process"""
+    return AssessmentStore()
+
+# Answer-to-points maps used by the scoring formula, in the order the options are shown
+QUALITY_MAP = {"Very Poor": 0, "Poor": 25, "Fair": 50, "Good": 75, "Excellent": 100}
+CRASH_MAP = {"Multiple times daily": 0, "Daily": 25, "Few times per week": 50, "Rarely": 75, "Never": 100}
+RECOVERY_MAP = {"Very slowly": 0, "Slowly": 25, "Average": 50, "Quickly": 75, "Very quickly": 100}
+HYDRATION_MAP = {"Less than 4 glasses": 0, "4-6 glasses": 25, "6-8 glasses": 75, "8-10 glasses": 100, "More than 10 glasses": 90}
+EXERCISE_MAP = {"Never": 0, "1-2 times": 25, "3-4 times": 50, "5-6 times": 75, "Daily": 100}
+# Refreshed-on-waking options are not quality ratings, so every answer scores the neutral 50
+REFRESHED_MAP = {"Never": 50, "Rarely": 50, "Sometimes": 50, "Often": 50, "Always": 50}
+FOCUS_MAP = {"Less than 15 minutes": 0, "15-30 minutes": 25, "30-60 minutes": 50, "1-2 hours": 75, "More than 2 hours": 100}
+GROWTH_MAP = {"Very Little": 0, "Somewhat": 25, "Moderately": 50, "Significantly": 75, "Completely": 100}
+INCOME_MAP = {"Under $25K": 10, "$25K-$50K": 25, "$50K-$75K": 40, "$75K-$100K": 60, "$100K-$150K": 75, "$150K-$250K": 90, "$250K+": 100}
+SAVINGS_MAP = {"0-5%": 10, "5-10%": 30, "10-15%": 50, "15-20%": 75, "20%+": 100}
+DEBT_MAP = {"Debt-free": 100, "Minimal debt": 75, "Moderate debt": 50, "High debt": 25, "Overwhelming debt": 0}
+EMERGENCY_MAP = {"No emergency fund": 0, "Less than 1 month": 20, "1-3 months": 40, "3-6 months": 80, "6+ months": 100}
+EXPERIENCE_MAP = {"Beginner": 20, "Novice": 40, "Intermediate": 60, "Advanced": 80, "Expert": 100}
+
+def slider_points(low: int, high: int) -> Dict[int, int]:
+    """Slider answers are scored on their raw value"""
+    return {value: value for value in range(low, high + 1)}
+
+# Every answer that feeds calculate_scores, with its domain, display label and points map
+SCORED_QUESTIONS = {
+    'sleep_hours': {'domain': 'biological', 'label': "Hours of sleep", 'points': slider_points(4, 12)},
+    'sleep_quality': {'domain': 'biological', 'label': "Sleep quality", 'points': QUALITY_MAP},
+    'wake_refreshed': {'domain': 'biological', 'label': "Waking refreshed", 'points': REFRESHED_MAP},
+    'energy_morning': {'domain': 'biological', 'label': "Morning energy", 'points': slider_points(1, 10)},
+    'energy_afternoon': {'domain': 'biological', 'label': "Afternoon energy", 'points': slider_points(1, 10)},
+    'energy_evening': {'domain': 'biological', 'label': "Evening energy", 'points': slider_points(1, 10)},
+    'energy_crashes': {'domain': 'biological', 'label': "Energy crashes", 'points': CRASH_MAP},
+    'stress_level': {'domain': 'biological', 'label': "Stress level", 'points': slider_points(1, 10)},
+    'stress_management': {'domain': 'biological', 'label': "Stress management", 'points': QUALITY_MAP},
+    'recovery_time': {'domain': 'biological', 'label': "Recovery speed", 'points': RECOVERY_MAP},
+    'nutrition_quality': {'domain': 'biological', 'label': "Nutrition quality", 'points': QUALITY_MAP},
+    'hydration': {'domain': 'biological', 'label': "Daily water intake", 'points': HYDRATION_MAP},
+    'exercise_frequency': {'domain': 'biological', 'label': "Exercise frequency", 'points': EXERCISE_MAP},
+    'focus_duration': {'domain': 'mental', 'label': "Deep focus duration", 'points': FOCUS_MAP},
+    'mental_clarity': {'domain': 'mental', 'label': "Mental clarity", 'points': slider_points(1, 10)},
+    'decision_making': {'domain': 'mental', 'label': "Decision-making confidence", 'points': QUALITY_MAP},
+    'memory_performance': {'domain': 'mental', 'label': "Memory performance", 'points': QUALITY_MAP},
+    'emotional_awareness': {'domain': 'mental', 'label': "Emotional self-awareness", 'points': slider_points(1, 10)},
+    'emotional_regulation': {'domain': 'mental', 'label': "Emotional regulation", 'points': QUALITY_MAP},
+    'social_skills': {'domain': 'mental', 'label': "Social skills", 'points': slider_points(1, 10)},
+    'empathy_level': {'domain': 'mental', 'label': "Empathy", 'points': slider_points(1, 10)},
+    'growth_mindset': {'domain': 'mental', 'label': "Growth mindset", 'points': GROWTH_MAP},
+    'self_confidence': {'domain': 'mental', 'label': "Self-confidence", 'points': slider_points(1, 10)},
+    'resilience': {'domain': 'mental', 'label': "Resilience", 'points': QUALITY_MAP},
+    'income_range': {'domain': 'financial', 'label': "Annual income", 'points': INCOME_MAP},
+    'savings_rate': {'domain': 'financial', 'label': "Savings rate", 'points': SAVINGS_MAP},
+    'debt_situation': {'domain': 'financial', 'label': "Debt situation", 'points': DEBT_MAP},
+    'emergency_fund': {'domain': 'financial', 'label': "Emergency fund", 'points': EMERGENCY_MAP},
+    'investment_experience': {'domain': 'financial', 'label': "Investment experience", 'points': EXPERIENCE_MAP},
+    'money_stress': {'domain': 'financial', 'label': "Money stress", 'points': slider_points(1, 10)},
+    'money_confidence': {'domain': 'financial', 'label': "Financial decision confidence", 'points': slider_points(1, 10)}
+}
+
+DOMAIN_LABELS = {'biological': "Biological", 'mental': "Mental", 'financial': "Financial"}
+
+# Assessment steps in the order participants move through them
+ASSESSMENT_STEPS = [
+    ('welcome', "Welcome"),
+    ('basic_info', "Basic Information"),
+    ('biological_assessment', "Biological Assessment"),
+    ('mental_assessment', "Mental Assessment"),
+    ('financial_assessment', "Financial Assessment"),
+    ('generate_results', "Results")
+]
+
+def is_admin_request() -> bool:
+    """True when the ?admin= query param matches the HUMAN20_ADMIN_TOKEN environment variable"""
+    token = os.environ.get("HUMAN20_ADMIN_TOKEN", "")
+    # Compare bytes: compare_digest rejects non-ASCII str arguments
+    return bool(token) and hmac.compare_digest(st.query_params.get("admin", "").encode(), token.encode())
+
+@st.cache_resource
+def get_report_template() -> ReportTemplate:
+    """Complete Report template, with fonts loaded once per server process"""
+    return ReportTemplate()
+
+def profiling_enabled() -> bool:
+    """Profile reruns when HUMAN20_PROFILE=1 or an admin request adds ?profile=1"""
+    if os.environ.get("HUMAN20_PROFILE") == "1":
+        return True
+    return st.query_params.get("profile") == "1" and is_admin_request()
 
 class Human20AssessmentBot:
     """
@@ -120,19 +217,22 @@ class Human20AssessmentBot:
         st.markdown("## 📋 Basic Information")
         st.markdown("Let's start with some basic information about you:")
         
+        # Pre-fill details kept from a previous assessment so repeat check-ins link up
+        previous = st.session_state.assessment_data
+        
         with st.form("basic_info_form"):
             col1, col2 = st.columns(2)
             
             with col1:
-                first_name = st.text_input("First Name*", key="first_name")
-                email = st.text_input("Email Address*", key="email")
+                first_name = st.text_input("First Name*", value=previous.get('first_name', ''), key="first_name")
+                email = st.text_input("Email Address*", value=previous.get('email', ''), key="email")
                 age = st.selectbox("Age Range", 
                     ["18-25", "26-35", "36-45", "46-55", "56-65", "65+"], key="age")
             
             with col2:
-                last_name = st.text_input("Last Name*", key="last_name")
-                phone = st.text_input("Phone Number", key="phone")
-                occupation = st.text_input("Occupation/Industry", key="occupation")
+                last_name = st.text_input("Last Name*", value=previous.get('last_name', ''), key="last_name")
+                phone = st.text_input("Phone Number", value=previous.get('phone', ''), key="phone")
+                occupation = st.text_input("Occupation/Industry", value=previous.get('occupation', ''), key="occupation")
             
             primary_goal = st.selectbox(
                 "What's your primary optimization goal?",
@@ -475,100 +575,182 @@ class Human20AssessmentBot:
                 st.session_state.current_step = 'generate_results'
                 st.rerun()
     
-    def calculate_scores(self) -> Dict[str, Any]:
-        """Calculate assessment scores across all domains"""
-        scores = {}
+    def answer_points(self, assessment_data: Dict[str, Any]) -> Dict[str, float]:
+        """Convert each scored answer into the points used by the scoring formula"""
+        return {
+            question: info['points'][assessment_data[info['domain']][question]]
+            for question, info in SCORED_QUESTIONS.items()
+        }
+    
+    def score_points(self, points: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine per-question points into domain, subcategory and overall scores
         
-        # Biological Optimization Score
-        bio_data = st.session_state.assessment_data['biological']
-        bio_score = 0
-        
-        # Sleep quality scoring
-        sleep_score = (bio_data['sleep_hours'] - 4) / 8 * 100  # Normalize to 0-100
-        quality_map = {"Very Poor": 0, "Poor": 25, "Fair": 50, "Good": 75, "Excellent": 100}
-        sleep_score += quality_map[bio_data['sleep_quality']]
-        sleep_score += quality_map.get(bio_data['wake_refreshed'], 50)
-        sleep_score /= 3
-        
-        # Energy scoring
-        energy_score = (bio_data['energy_morning'] + bio_data['energy_afternoon'] + bio_data['energy_evening']) / 3 * 10
-        crash_map = {"Multiple times daily": 0, "Daily": 25, "Few times per week": 50, "Rarely": 75, "Never": 100}
-        energy_score = (energy_score + crash_map[bio_data['energy_crashes']]) / 2
-        
-        # Stress and recovery scoring
-        stress_score = (10 - bio_data['stress_level']) * 10  # Invert stress level
-        stress_score += quality_map[bio_data['stress_management']]
-        recovery_map = {"Very slowly": 0, "Slowly": 25, "Average": 50, "Quickly": 75, "Very quickly": 100}
-        stress_score += recovery_map[bio_data['recovery_time']]
-        stress_score /= 3
-        
-        # Nutrition scoring
-        nutrition_score = quality_map[bio_data['nutrition_quality']]
-        hydration_map = {"Less than 4 glasses": 0, "4-6 glasses": 25, "6-8 glasses": 75, "8-10 glasses": 100, "More than 10 glasses": 90}
-        exercise_map = {"Never": 0, "1-2 times": 25, "3-4 times": 50, "5-6 times": 75, "Daily": 100}
-        nutrition_score = (nutrition_score + hydration_map[bio_data['hydration']] + exercise_map[bio_data['exercise_frequency']]) / 3
+        The formula only uses element-wise arithmetic, so every value in `points`
+        may be a single number or a NumPy array holding alternative answers.
+        """
+        p = points
         
+        # Biological Optimization Score
+        sleep_score = ((p['sleep_hours'] - 4) / 8 * 100 + p['sleep_quality'] + p['wake_refreshed']) / 3
+        energy_score = ((p['energy_morning'] + p['energy_afternoon'] + p['energy_evening']) / 3 * 10 + p['energy_crashes']) / 2
+        stress_score = ((10 - p['stress_level']) * 10 + p['stress_management'] + p['recovery_time']) / 3  # Invert stress level
+        nutrition_score = (p['nutrition_quality'] + p['hydration'] + p['exercise_frequency']) / 3
         bio_score = (sleep_score * 0.25 + energy_score * 0.25 + stress_score * 0.20 + nutrition_score * 0.30)
-        scores['biological'] = min(100, max(0, bio_score))
         
         # Mental Architecture Score
-        mental_data = st.session_state.assessment_data['mental']
-        mental_score = 0
-        
-        # Cognitive performance
-        focus_map = {"Less than 15 minutes": 0, "15-30 minutes": 25, "30-60 minutes": 50, "1-2 hours": 75, "More than 2 hours": 100}
-        cognitive_score = focus_map[mental_data['focus_duration']]
-        cognitive_score += mental_data['mental_clarity'] * 10
-        cognitive_score += quality_map[mental_data['decision_making']]
-        cognitive_score += quality_map[mental_data['memory_performance']]
-        cognitive_score /= 4
-        
-        # Emotional intelligence
-        emotional_score = (mental_data['emotional_awareness'] + mental_data['social_skills'] + mental_data['empathy_level']) / 3 * 10
-        emotional_score += quality_map[mental_data['emotional_regulation']]
-        emotional_score /= 2
-        
-        # Mindset and resilience
-        growth_map = {"Very Little": 0, "Somewhat": 25, "Moderately": 50, "Significantly": 75, "Completely": 100}
-        mindset_score = growth_map[mental_data['growth_mindset']]
-        mindset_score += mental_data['self_confidence'] * 10
-        mindset_score += quality_map[mental_data['resilience']]
-        mindset_score /= 3
-        
+        cognitive_score = (p['focus_duration'] + p['mental_clarity'] * 10 + p['decision_making'] + p['memory_performance']) / 4
+        emotional_score = ((p['emotional_awareness'] + p['social_skills'] + p['empathy_level']) / 3 * 10 + p['emotional_regulation']) / 2
+        mindset_score = (p['growth_mindset'] + p['self_confidence'] * 10 + p['resilience']) / 3
         mental_score = (cognitive_score * 0.30 + emotional_score * 0.35 + mindset_score * 0.35)
-        scores['mental'] = min(100, max(0, mental_score))
         
         # Financial Intelligence Score
-        financial_data = st.session_state.assessment_data['financial']
-        financial_score = 0
-        
-        # Income and savings
-        income_map = {"Under $25K": 10, "$25K-$50K": 25, "$50K-$75K": 40, "$75K-$100K": 60, "$100K-$150K": 75, "$150K-$250K": 90, "$250K+": 100}
-        savings_map = {"0-5%": 10, "5-10%": 30, "10-15%": 50, "15-20%": 75, "20%+": 100}
-        wealth_score = (income_map[financial_data['income_range']] + savings_map[financial_data['savings_rate']]) / 2
-        
-        # Debt and emergency fund
-        debt_map = {"Debt-free": 100, "Minimal debt": 75, "Moderate debt": 50, "High debt": 25, "Overwhelming debt": 0}
-        emergency_map = {"No emergency fund": 0, "Less than 1 month": 20, "1-3 months": 40, "3-6 months": 80, "6+ months": 100}
-        stability_score = (debt_map[financial_data['debt_situation']] + emergency_map[financial_data['emergency_fund']]) / 2
-        
-        # Investment and mindset
-        exp_map = {"Beginner": 20, "Novice": 40, "Intermediate": 60, "Advanced": 80, "Expert": 100}
-        investment_score = exp_map[financial_data['investment_experience']]
-        mindset_score = (10 - financial_data['money_stress']) * 10 + financial_data['money_confidence'] * 10
-        mindset_score /= 2
+        wealth_score = (p['income_range'] + p['savings_rate']) / 2
+        stability_score = (p['debt_situation'] + p['emergency_fund']) / 2
+        investment_score = p['investment_experience']
+        money_mindset_score = ((10 - p['money_stress']) * 10 + p['money_confidence'] * 10) / 2
+        financial_score = (wealth_score * 0.30 + stability_score * 0.25 + investment_score * 0.20 + money_mindset_score * 0.25)
         
-        financial_score = (wealth_score * 0.30 + stability_score * 0.25 + investment_score * 0.20 + mindset_score * 0.25)
-        scores['financial'] = min(100, max(0, financial_score))
+        scores = {
+            'biological': np.clip(bio_score, 0, 100),
+            'mental': np.clip(mental_score, 0, 100),
+            'financial': np.clip(financial_score, 0, 100),
+            'subcategories': {
+                'sleep_quality': sleep_score,
+                'energy_levels': energy_score,
+                'stress_recovery': stress_score,
+                'nutrition_fitness': nutrition_score,
+                'cognitive_performance': cognitive_score,
+                'emotional_intelligence': emotional_score,
+                'mindset_resilience': mindset_score,
+                'wealth_building': wealth_score,
+                'financial_stability': stability_score,
+                'investment_intelligence': investment_score,
+                'money_mindset': money_mindset_score
+            }
+        }
         
         # Overall Human 2.0 Score
         scores['overall'] = (scores['biological'] * 0.33 + scores['mental'] * 0.33 + scores['financial'] * 0.34)
         
         return scores
     
-    def generate_ai_analysis(self, scores: Dict[str, Any]) -> str:
-        """Generate AI-powered analysis and recommendations"""
+    def calculate_scores(self) -> Dict[str, Any]:
+        """Calculate assessment scores across all domains"""
+        raw = self.score_points(self.answer_points(st.session_state.assessment_data))
+        
+        scores = {key: float(raw[key]) for key in ['biological', 'mental', 'financial', 'overall']}
+        scores['subcategories'] = {key: float(value) for key, value in raw['subcategories'].items()}
+        
+        return scores
+    
+    def find_top_opportunities(self, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Rank the answers whose one-level improvement would raise the overall score most
+        
+        Every alternative answer one level above or below the current one is scored in
+        a single vectorized pass; each question keeps its best alternative.
+        
+        Args:
+            limit: Maximum number of opportunities to return
+        """
+        assessment_data = st.session_state.assessment_data
+        base = self.answer_points(assessment_data)
+        
+        # Row 0 is the participant's actual answers, row i the i-th alternative
+        alternatives = []
+        for question, info in SCORED_QUESTIONS.items():
+            levels = list(info['points'])
+            current = levels.index(assessment_data[info['domain']][question])
+            for index in (current - 1, current + 1):
+                if 0 <= index < len(levels):
+                    alternatives.append((question, levels[index]))
+        
+        columns = {question: np.full(len(alternatives) + 1, value, dtype=float) for question, value in base.items()}
+        for row, (question, answer) in enumerate(alternatives, start=1):
+            columns[question][row] = SCORED_QUESTIONS[question]['points'][answer]
+        
+        results = self.score_points(columns)
+        overall_gain = results['overall'][1:] - results['overall'][0]
+        
+        best = {}
+        for row in np.argsort(-overall_gain, kind='stable'):
+            question, answer = alternatives[row]
+            if overall_gain[row] <= 0:
+                break
+            if question in best:
+                continue
+            domain = SCORED_QUESTIONS[question]['domain']
+            best[question] = {
+                'question': question,
+                'label': SCORED_QUESTIONS[question]['label'],
+                'domain': domain,
+                'current': assessment_data[domain][question],
+                'suggested': answer,
+                'domain_gain': float(results[domain][row + 1] - results[domain][0]),
+                'overall_gain': float(overall_gain[row])
+            }
+            if len(best) == limit:
+                break
+        
+        return list(best.values())
+    
+    def record_progress(self, scores: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """Store this check-in once per session and return this browser session's check-ins"""
+        store = get_assessment_store()
+        email = st.session_state.assessment_data['email']
+        session_checkins = st.session_state.setdefault('session_checkins', [])
+        
+        if 'progress_taken_at' not in st.session_state:
+            st.session_state.progress_taken_at = store.save_submission(st.session_state.assessment_data, scores)
+            session_checkins.append(st.session_state.progress_taken_at)
+        
+        # The email address is not verified, so only check-ins made in this
+        # browser session are shown - never other stored history for the address
+        return store.load_history(email, taken_at=session_checkins)
+    
+    def build_complete_report(self, ai_analysis: str, opportunities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Store the report details once per session and render the Complete Report PDF"""
+        if 'report_pdf' not in st.session_state:
+            store = get_assessment_store()
+            assessment_data = st.session_state.assessment_data
+            taken_at = st.session_state.progress_taken_at
+            store.save_report_details(assessment_data, taken_at, ai_analysis, opportunities, self.business_profile)
+            submission = store.load_submission(assessment_data['email'], taken_at)
+            st.session_state.report_pdf = {
+                'data': get_report_template().render(submission),
+                'file_name': report_filename(submission)
+            }
+        return st.session_state.report_pdf
+    
+    def display_progress(self, history: Dict[str, List[Any]]):
+        """Display the history chart for participants with repeat check-ins"""
+        if len(history['taken_at']) < 2:
+            return
+        
+        st.markdown("## 📈 Your Progress Over Time")
+        dates = [datetime.datetime.fromtimestamp(ts) for ts in history['taken_at']]
+        
+        fig = go.Figure()
+        for key, label in [('biological', 'Biological'), ('mental', 'Mental'),
+                           ('financial', 'Financial'), ('overall', 'Overall H2.0')]:
+            fig.add_trace(go.Scatter(x=dates, y=history[key], mode='lines+markers', name=label))
+        
+        fig.update_layout(
+            yaxis=dict(range=[0, 100]),
+            title=f"Your Human 2.0 Scores Across {len(dates)} Check-ins"
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def generate_ai_analysis(self, scores: Dict[str, Any], opportunities: List[Dict[str, Any]]) -> Optional[str]:
+        """Generate AI-powered analysis and recommendations (None if the AI call fails)"""
         assessment_data = st.session_state.assessment_data
+        opportunity_lines = "\n".join(
+            f"        - {opp['label']}: {opp['current']} -> {opp['suggested']} "
+            f"(+{opp['domain_gain']:.1f} {DOMAIN_LABELS[opp['domain']]}, +{opp['overall_gain']:.1f} overall)"
+            for opp in opportunities
+        ) or "        - None (every answer is already at its best level)"
         
         prompt = f"""
         As a Human 2.0 Optimization Expert, analyze this comprehensive assessment data and provide personalized insights and recommendations.
@@ -589,9 +771,12 @@ class Human20AssessmentBot:
         MENTAL DATA: {assessment_data['mental']}
         FINANCIAL DATA: {assessment_data['financial']}
         
+        TOP OPTIMIZATION OPPORTUNITIES (precomputed from the scoring model, ranked by overall score gain from a one-level improvement):
+{opportunity_lines}
+        
         Provide a comprehensive analysis that includes:
         1. Overall Human 2.0 readiness assessment
-        2. Top 3 optimization opportunities with specific impact potential
+        2. Action plans for the precomputed top optimization opportunities above (use them as given, do not re-rank them)
         3. Interconnection analysis (how improving one area will amplify others)
         4. Personalized "dangerous upgrade" recommendations
         5. Specific AI tools and strategies that would be most beneficial
@@ -610,12 +795,19 @@ class Human20AssessmentBot:
             )
             return response.choices[0].message.content
         except Exception as e:
-            return f"AI analysis temporarily unavailable. Please contact {self.business_profile['email']} for your personalized assessment."
+            return None
     
     def display_results(self):
         """Display comprehensive assessment results"""
         scores = self.calculate_scores()
-        ai_analysis = self.generate_ai_analysis(scores)
+        history = self.record_progress(scores)
+        opportunities = self.find_top_opportunities()
+        
+        # Change since the previous check-in, between the same whole-point values the metrics show
+        deltas = {key: None for key in ['biological', 'mental', 'financial', 'overall']}
+        if len(history['taken_at']) >= 2:
+            for key in deltas:
+                deltas[key] = f"{int(f'{scores[key]:.0f}') - int(f'{history[key][-2]:.0f}'):+d}"
         
         st.markdown(f"# 🚀 Your Human 2.0 Assessment Results")
         st.markdown(f"## {self.business_profile['brand_message']}")
@@ -624,13 +816,13 @@ class Human20AssessmentBot:
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("🧬 Biological", f"{scores['biological']:.0f}/100")
+            st.metric("🧬 Biological", f"{scores['biological']:.0f}/100", delta=deltas['biological'])
         with col2:
-            st.metric("🧠 Mental", f"{scores['mental']:.0f}/100")
+            st.metric("🧠 Mental", f"{scores['mental']:.0f}/100", delta=deltas['mental'])
         with col3:
-            st.metric("💰 Financial", f"{scores['financial']:.0f}/100")
+            st.metric("💰 Financial", f"{scores['financial']:.0f}/100", delta=deltas['financial'])
         with col4:
-            st.metric("🚀 Overall H2.0", f"{scores['overall']:.0f}/100")
+            st.metric("🚀 Overall H2.0", f"{scores['overall']:.0f}/100", delta=deltas['overall'])
         
         # Radar Chart
         categories = ['Biological\nOptimization', 'Mental\nArchitecture', 'Financial\nIntelligence']
@@ -657,9 +849,32 @@ class Human20AssessmentBot:
         
         st.plotly_chart(fig, use_container_width=True)
         
+        self.display_progress(history)
+        
+        # Top Opportunities - computed locally so they show before the AI analysis arrives
+        st.markdown("## 🎯 Your Top Optimization Opportunities")
+        if opportunities:
+            for rank, opp in enumerate(opportunities, start=1):
+                st.markdown(
+                    f"**{rank}. {opp['label']}** - {opp['current']} → {opp['suggested']}: "
+                    f"+{opp['domain_gain']:.1f} {DOMAIN_LABELS[opp['domain']]}, "
+                    f"+{opp['overall_gain']:.1f} Overall H2.0"
+                )
+        else:
+            st.markdown("Every scored answer is already at its best level. Time to get dangerous!")
+        
         # AI Analysis
         st.markdown("## 🤖 AI-Powered Analysis & Recommendations")
-        st.markdown(ai_analysis)
+        # Generated once per session so reruns (e.g. downloading the report) reuse the
+        # same analysis; failures are not cached so the next rerun tries again
+        if st.session_state.get('ai_analysis') is None:
+            with st.spinner("Generating your personalized analysis..."):
+                st.session_state.ai_analysis = self.generate_ai_analysis(scores, opportunities)
+        ai_analysis = st.session_state.ai_analysis
+        if ai_analysis is not None:
+            st.markdown(ai_analysis)
+        else:
+            st.markdown(f"AI analysis temporarily unavailable. Please contact {self.business_profile['email']} for your personalized assessment.")
         
         # Next Steps
         st.markdown("## 🎯 Your Next Steps to Human 2.0")
@@ -702,18 +917,117 @@ class Human20AssessmentBot:
             - Phone: {self.business_profile['phone']}
             - Website: {self.business_profile['website']}
             """)
+            
+            # The report is only built from a real AI analysis, never the fallback message
+            if ai_analysis is not None:
+                report = self.build_complete_report(ai_analysis, opportunities)
+                st.download_button(
+                    "📄 Download My Complete Report",
+                    data=report['data'],
+                    file_name=report['file_name'],
+                    mime="application/pdf",
+                    key="download_report"
+                )
+            else:
+                st.info("Your downloadable report will be ready once your AI analysis is available.")
         
         # Save results
         if st.button("📧 Email My Results", key="email_results"):
             # In a real implementation, this would send an email
             st.success(f"Your complete Human 2.0 Assessment Report has been sent to {st.session_state.assessment_data['email']}")
         
-        # Reset option
+        # Reset option - keep contact details so the next check-in links to this one,
+        # this session's check-ins for the progress chart, and the reached funnel
+        # steps so a retake is not counted as a new session
         if st.button("🔄 Take Assessment Again", key="reset"):
-            for key in st.session_state.keys():
+            basic_info = {key: st.session_state.assessment_data.get(key, '')
+                          for key in ['first_name', 'last_name', 'email', 'phone', 'occupation']}
+            reached_steps = st.session_state.get('reached_steps', set())
+            session_checkins = st.session_state.get('session_checkins', [])
+            for key in list(st.session_state.keys()):
                 del st.session_state[key]
+            st.session_state.assessment_data = basic_info
+            st.session_state.reached_steps = reached_steps
+            st.session_state.session_checkins = session_checkins
+            st.session_state.current_step = 'basic_info'
             st.rerun()
 
+    def record_funnel_step(self):
+        """Count the current step the first time this session reaches it"""
+        reached_steps = st.session_state.setdefault('reached_steps', set())
+        step = st.session_state.current_step
+        if step not in reached_steps:
+            get_assessment_store().record_step(step)
+            reached_steps.add(step)
+    
+    def display_coach_dashboard(self):
+        """Display the coach analytics dashboard (admin only)"""
+        analytics = get_assessment_store().load_analytics()
+        total = analytics['scores']['all'][0] if analytics['scores']['all'] else None
+        
+        st.markdown(f"# 📊 {self.business_profile['business_name']} Coach Dashboard")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("👋 Sessions Started", analytics['funnel'].get('welcome', 0))
+        with col2:
+            st.metric("✅ Assessments Completed", total['submissions'] if total else 0)
+        with col3:
+            st.metric("🚀 Average H2.0 Score", f"{total['overall']:.0f}/100" if total else "-")
+        
+        # Funnel drop-off
+        st.markdown("## 🔻 Assessment Funnel")
+        funnel = pd.DataFrame(
+            [(label, analytics['funnel'].get(step, 0)) for step, label in ASSESSMENT_STEPS],
+            columns=['Step', 'Sessions']
+        )
+        previous = funnel['Sessions'].shift(1)
+        funnel['Drop-off'] = ((previous - funnel['Sessions']) / previous).where(previous > 0).map(
+            lambda value: f"{value:.0%}" if pd.notna(value) else "-"
+        )
+        st.plotly_chart(px.funnel(funnel, x='Sessions', y='Step'), use_container_width=True)
+        st.dataframe(funnel, hide_index=True, use_container_width=True)
+        
+        # Score distributions
+        st.markdown("## 📈 Score Distributions")
+        dimension = st.selectbox(
+            "Break scores down by",
+            ['age', 'occupation', 'primary_goal'],
+            format_func=lambda key: key.replace('_', ' ').title(),
+            key="dashboard_dimension"
+        )
+        scores = pd.DataFrame(analytics['scores'][dimension])
+        if scores.empty:
+            st.info("No completed assessments yet.")
+        else:
+            scores = scores.rename(columns={
+                'bucket': 'Group', 'submissions': 'Submissions', 'overall': 'Overall',
+                'biological': 'Biological', 'mental': 'Mental', 'financial': 'Financial'
+            })
+            st.dataframe(scores.round(1), hide_index=True, use_container_width=True)
+            
+            histogram = pd.DataFrame(analytics['histogram'][dimension])
+            histogram['Score Range'] = histogram['score_bin'].map(
+                lambda low: f"{low}-{low + HISTOGRAM_BIN_WIDTH}"
+            )
+            fig = px.bar(
+                histogram, x='Score Range', y='submissions', color='bucket', barmode='group',
+                labels={'submissions': 'Submissions', 'bucket': 'Group'},
+                title="Overall H2.0 Score Distribution"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Most common beliefs
+        st.markdown("## 💭 Most Common Beliefs")
+        col1, col2 = st.columns(2)
+        for column, field, title in [(col1, 'limiting_beliefs', "🧠 Limiting Beliefs"),
+                                     (col2, 'wealth_beliefs', "💰 Wealth Beliefs")]:
+            with column:
+                st.markdown(f"### {title}")
+                beliefs = pd.DataFrame(analytics['beliefs'][field], columns=['belief', 'submissions'])
+                beliefs.columns = ['Belief', 'Submissions']
+                st.dataframe(beliefs, hide_index=True, use_container_width=True)
+
 def main():
     """Main application function"""
     st.set_page_config(
@@ -741,33 +1055,55 @@ def main():
     # Initialize bot
     bot = Human20AssessmentBot(api_key, business_profile)
     
+    # Coach dashboard: ?view=coach&admin=<HUMAN20_ADMIN_TOKEN>
+    if st.query_params.get("view") == "coach" and is_admin_request():
+        bot.display_coach_dashboard()
+        return
+    
+    bot.record_funnel_step()
+    
+    # Optional per-rerun profile of the step handler (see session_profiler.py)
+    if profiling_enabled():
+        session_id = st.session_state.setdefault('profile_session_id', uuid.uuid4().hex[:8])
+        profiler = SessionProfiler(st.session_state.current_step, session_id)
+    else:
+        profiler = contextlib.nullcontext()
+    
     # Navigation logic
-    if st.session_state.current_step == 'welcome':
-        bot.display_welcome_screen()
-    elif st.session_state.current_step == 'basic_info':
-        bot.collect_basic_information()
-    elif st.session_state.current_step == 'biological_assessment':
-        bot.biological_optimization_assessment()
-    elif st.session_state.current_step == 'mental_assessment':
-        bot.mental_architecture_assessment()
-    elif st.session_state.current_step == 'financial_assessment':
-        bot.financial_intelligence_assessment()
-    elif st.session_state.current_step == 'generate_results':
-        bot.display_results()
+    with profiler:
+        if st.session_state.current_step == 'welcome':
+            bot.display_welcome_screen()
+        elif st.session_state.current_step == 'basic_info':
+            bot.collect_basic_information()
+        elif st.session_state.current_step == 'biological_assessment':
+            bot.biological_optimization_assessment()
+        elif st.session_state.current_step == 'mental_assessment':
+            bot.mental_architecture_assessment()
+        elif st.session_state.current_step == 'financial_assessment':
+            bot.financial_intelligence_assessment()
+        elif st.session_state.current_step == 'generate_results':
+            bot.display_results()
 
 if __name__ == "__main__":
     main()
 
 # DEPLOYMENT INSTRUCTIONS:
-# 1. Install required packages: pip install streamlit openai plotly pandas
+# 1. Install required packages: pip install streamlit openai plotly pandas numpy reportlab
 # 2. Replace "your-openai-api-key-here" with your actual OpenAI API key
 # 3. Customize the business_profile dictionary with your information
 # 4. Run with: streamlit run human_2_0_assessment_bot.py
 # 5. For production deployment, use Streamlit Cloud, Heroku, or similar platform
+# 6. Assessment history is stored in SQLite; set HUMAN20_DB_PATH to choose the database file
+# 7. Set HUMAN20_ADMIN_TOKEN and open ?view=coach&admin=<token> for the coach dashboard
+# 8. Render stored Complete Reports overnight with: python report_renderer.py bulk reports/
+#    (python report_renderer.py benchmark measures render time and throughput)
+# 9. To diagnose slow pages, set HUMAN20_PROFILE=1 (or add &profile=1 to an admin URL);
+#    each rerun writes a flame graph profile (.folded) to HUMAN20_PROFILE_DIR (default: profiles/)
 
 # CUSTOMIZATION NOTES:
 # - All business information is in the business_profile dictionary
 # - Scoring algorithms can be adjusted in the calculate_scores method
+#   (new subcategory scores also need a column in assessment_store.SUBCATEGORY_COLUMNS)
 # - Assessment questions can be modified in each assessment method
 # - AI analysis prompt can be customized in generate_ai_analysis method
 # - Branding and messaging can be updated throughout the interface
@@ -0,0 +1,438 @@
+# Human 2.0 Assessment Bot - Complete Report Renderer
+# Created for DrewIs.. UpLevel Movement Business
+# Turns stored submissions into branded PDF reports, one at a time or in bulk
+
+import argparse
+import datetime
+import io
+import logging
+import os
+import random
+import re
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.spider import SpiderChart
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from assessment_store import AssessmentStore, DEFAULT_DB_PATH, DOMAIN_COLUMNS, SUBCATEGORY_COLUMNS
+
+# Optional TrueType fonts; without them the built-in Helvetica is used, characters
+# it cannot draw (such as CJK names or emoji) are printed as "?" and a warning is logged
+REPORT_FONT_PATH = os.environ.get("HUMAN20_REPORT_FONT", "")
+REPORT_BOLD_FONT_PATH = os.environ.get("HUMAN20_REPORT_BOLD_FONT", "")
+
+BRAND_COLOR = colors.HexColor('#FF6B6B')
+
+DOMAIN_LABELS = {
+    'biological': "Biological Optimization",
+    'mental': "Mental Architecture",
+    'financial': "Financial Intelligence",
+    'overall': "Overall Human 2.0"
+}
+SUBCATEGORY_LABELS = {column: column.replace('_', ' ').title() for column in SUBCATEGORY_COLUMNS}
+
+logger = logging.getLogger(__name__)
+
+
+class ReportTemplate:
+    """
+    Reusable layout for the Complete Report.
+
+    Fonts and paragraph styles are set up once when the template is created,
+    so one template (one per worker process) can render any number of reports.
+    """
+
+    def __init__(self, font_path: str = REPORT_FONT_PATH, bold_font_path: str = REPORT_BOLD_FONT_PATH):
+        """
+        Load fonts and build the paragraph styles
+
+        Args:
+            font_path: Optional TrueType font for body text
+            bold_font_path: Optional TrueType font for bold text (defaults to font_path)
+        """
+        if font_path:
+            pdfmetrics.registerFont(TTFont("ReportFont", font_path))
+            pdfmetrics.registerFont(TTFont("ReportFont-Bold", bold_font_path or font_path))
+            pdfmetrics.registerFontFamily("ReportFont", normal="ReportFont", bold="ReportFont-Bold",
+                                          italic="ReportFont", boldItalic="ReportFont-Bold")
+            self.font, self.bold_font, self.encoding = "ReportFont", "ReportFont-Bold", None
+        else:
+            self.font, self.bold_font, self.encoding = "Helvetica", "Helvetica-Bold", "cp1252"
+        # Per-thread count of substituted characters, as the app shares one template across sessions
+        self._local = threading.local()
+
+        base = getSampleStyleSheet()
+        self.styles = {
+            'title': ParagraphStyle('ReportTitle', parent=base['Title'], fontName=self.bold_font, textColor=BRAND_COLOR),
+            'heading': ParagraphStyle('ReportHeading', parent=base['Heading2'], fontName=self.bold_font),
+            'subheading': ParagraphStyle('ReportSubheading', parent=base['Heading3'], fontName=self.bold_font),
+            'body': ParagraphStyle('ReportBody', parent=base['BodyText'], fontName=self.font, leading=14),
+            'bullet': ParagraphStyle('ReportBullet', parent=base['BodyText'], fontName=self.font, leading=14,
+                                     leftIndent=18, bulletIndent=6),
+            'brand': ParagraphStyle('ReportBrand', parent=base['Italic'], fontName=self.font, alignment=1)
+        }
+
+    def render(self, submission: Dict[str, Any]) -> bytes:
+        """
+        Render one stored submission to PDF
+
+        Args:
+            submission: Dictionary returned by AssessmentStore.load_submission
+
+        Returns:
+            The PDF document as bytes
+        """
+        profile = submission['business_profile']
+        scores = submission['scores']
+        self._local.substituted = 0
+        taken_on = datetime.datetime.fromtimestamp(submission['taken_at']).strftime("%B %d, %Y")
+
+        story = [
+            Paragraph(self._text("Human 2.0 Assessment Report"), self.styles['title']),
+            Paragraph(self._text(f"{submission['first_name']} {submission['last_name']} - {taken_on}"), self.styles['brand']),
+            Paragraph(self._text(profile.get('brand_message', '')), self.styles['brand']),
+            Spacer(1, 0.2 * inch),
+            self._radar_chart(scores),
+            Paragraph(self._text("Complete Scoring Breakdown"), self.styles['heading']),
+            self._scores_table(scores),
+            Paragraph(self._text("Top Optimization Opportunities"), self.styles['heading'])
+        ]
+
+        for rank, opp in enumerate(submission['opportunities'], start=1):
+            story.append(Paragraph(self._text(
+                f"**{rank}. {opp['label']}**: {opp['current']} -> {opp['suggested']} "
+                f"(+{opp['domain_gain']:.1f} {DOMAIN_LABELS[opp['domain']]}, +{opp['overall_gain']:.1f} overall)"
+            ), self.styles['body']))
+        if not submission['opportunities']:
+            story.append(Paragraph(self._text("Every scored answer is already at its best level."), self.styles['body']))
+
+        story.append(Paragraph(self._text("Your Personalized Roadmap"), self.styles['heading']))
+        story.extend(self._analysis(submission['ai_analysis']))
+
+        story.append(Spacer(1, 0.3 * inch))
+        story.append(Paragraph(self._text(
+            f"Ready for your upgrade? Book a strategy session with {profile.get('coach_name', '')}: "
+            f"{profile.get('calendar_link', '')}"
+        ), self.styles['body']))
+
+        def draw_footer(canvas, doc):
+            canvas.saveState()
+            canvas.setFont(self.font, 8)
+            canvas.setFillColor(colors.grey)
+            footer = self._text(
+                f"{profile.get('business_name', '')} | {profile.get('website', '')} | "
+                f"{profile.get('email', '')} | {profile.get('phone', '')}", markup=False
+            )
+            canvas.drawString(doc.leftMargin, 0.5 * inch, footer)
+            canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 0.5 * inch, f"Page {doc.page}")
+            canvas.restoreState()
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer, pagesize=letter,
+            title="Human 2.0 Assessment Report",
+            author=profile.get('business_name', '')
+        )
+        doc.build(story, onFirstPage=draw_footer, onLaterPages=draw_footer)
+
+        if self._local.substituted:
+            logger.warning(
+                "Report for %s taken at %s: %d characters the built-in font cannot draw were printed as '?'; "
+                "set HUMAN20_REPORT_FONT to a Unicode TrueType font",
+                submission['email'], submission['taken_at'], self._local.substituted
+            )
+        return buffer.getvalue()
+
+    def _text(self, text: str, markup: bool = True) -> str:
+        """Escape text for the PDF, turning **bold** into markup and substituting undrawable characters"""
+        if self.encoding:
+            try:
+                text.encode(self.encoding)
+            except UnicodeEncodeError:
+                drawable = [self._encodable(char) for char in text]
+                self._local.substituted = getattr(self._local, 'substituted', 0) + drawable.count(False)
+                text = "".join(char if ok else "?" for char, ok in zip(text, drawable))
+        if not markup:
+            return text
+        return re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", escape(text))
+
+    def _encodable(self, char: str) -> bool:
+        """True if the built-in font's encoding has the character"""
+        try:
+            char.encode(self.encoding)
+            return True
+        except UnicodeEncodeError:
+            return False
+
+    def _radar_chart(self, scores: Dict[str, Any]) -> Drawing:
+        """Draw the three domain scores as a radar chart on a 0-100 scale"""
+        drawing = Drawing(6 * inch, 2.6 * inch)
+        chart = SpiderChart()
+        chart.x, chart.y = 1.9 * inch, 0.2 * inch
+        chart.width = chart.height = 2.2 * inch
+        chart.labels = [DOMAIN_LABELS[key] for key in ['biological', 'mental', 'financial']]
+        # The first strand is the 100-point outline, so scores are drawn to scale
+        chart.data = [[100, 100, 100], [scores['biological'], scores['mental'], scores['financial']]]
+        chart.strands[0].strokeColor = colors.lightgrey
+        chart.strands[0].fillColor = None
+        chart.strands[1].strokeColor = BRAND_COLOR
+        chart.strands[1].fillColor = colors.Color(BRAND_COLOR.red, BRAND_COLOR.green, BRAND_COLOR.blue, alpha=0.35)
+        chart.strands[1].strokeWidth = 2
+        chart.spokeLabels.fontName = self.font
+        chart.spokeLabels.fontSize = 9
+        drawing.add(chart)
+        return drawing
+
+    def _scores_table(self, scores: Dict[str, Any]) -> Table:
+        """Domain and subcategory scores as a table"""
+        rows = [["Area", "Score"]]
+        rows += [[DOMAIN_LABELS[key], f"{scores[key]:.0f}/100"] for key in DOMAIN_COLUMNS]
+        rows += [[f"    {SUBCATEGORY_LABELS[key]}", f"{value:.0f}/100"] for key, value in scores['subcategories'].items()]
+
+        table = Table(rows, colWidths=[3.5 * inch, 1.2 * inch], hAlign='LEFT')
+        table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, 0), (-1, len(DOMAIN_COLUMNS)), self.bold_font),
+            ('BACKGROUND', (0, 0), (-1, 0), BRAND_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey)
+        ]))
+        return table
+
+    def _analysis(self, ai_analysis: str) -> List[Any]:
+        """Convert the markdown AI analysis into paragraphs, headings and bullets"""
+        flowables = []
+        paragraph: List[str] = []
+
+        def flush():
+            if paragraph:
+                flowables.append(Paragraph(self._text(" ".join(paragraph)), self.styles['body']))
+                paragraph.clear()
+
+        for line in ai_analysis.splitlines():
+            stripped = line.strip()
+            bullet = re.match(r"^([-*]|\d+[.)])\s+(.*)$", stripped)
+            if not stripped:
+                flush()
+            elif stripped.startswith('#'):
+                flush()
+                flowables.append(Paragraph(self._text(stripped.lstrip('#').strip()), self.styles['subheading']))
+            elif bullet:
+                flush()
+                marker = bullet.group(1) if bullet.group(1)[0].isdigit() else "•"
+                flowables.append(Paragraph(self._text(bullet.group(2)), self.styles['bullet'], bulletText=marker))
+            else:
+                paragraph.append(stripped)
+        flush()
+
+        return flowables
+
+
+def report_filename(submission: Dict[str, Any]) -> str:
+    """File name for a rendered report"""
+    return f"{submission['taken_at']}_{re.sub(r'[^A-Za-z0-9._-]', '_', submission['email'])}.pdf"
+
+
+# Per-process state for the worker pool, set up once by _init_worker
+_worker_template: Optional[ReportTemplate] = None
+_worker_store: Optional[AssessmentStore] = None
+
+
+def _init_worker(db_path: str, font_path: str, bold_font_path: str):
+    """Load the template, fonts and database connection once per worker process"""
+    global _worker_template, _worker_store
+    _worker_template = ReportTemplate(font_path, bold_font_path)
+    _worker_store = AssessmentStore(db_path)
+
+
+def _render_to_file(key: Tuple[str, int], out_dir: str) -> Tuple[float, int]:
+    """Render one stored submission into out_dir, returning (render seconds, PDF bytes)"""
+    submission = _worker_store.load_submission(*key)
+    if submission is None:
+        raise LookupError("no stored report details")
+    start = time.perf_counter()
+    pdf = _worker_template.render(submission)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(out_dir, report_filename(submission)), 'wb') as report_file:
+        report_file.write(pdf)
+    return elapsed, len(pdf)
+
+
+def render_pool(keys: Iterable[Tuple[str, int]], out_dir: str, db_path: str = DEFAULT_DB_PATH,
+                workers: Optional[int] = None, font_path: str = REPORT_FONT_PATH,
+                bold_font_path: str = REPORT_BOLD_FONT_PATH) -> Iterator[Tuple[Tuple[str, int], Optional[float], int]]:
+    """
+    Render reports for `keys` in a worker pool, yielding (key, render seconds, PDF bytes) per report
+
+    Workers load submissions themselves and write PDFs straight to disk, and at
+    most two tasks per worker are queued at a time, so memory stays flat no
+    matter how many keys are passed in. A report that fails is logged and
+    yielded with render seconds None, and the remaining keys are still rendered.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    keys = iter(keys)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db_path, font_path, bold_font_path)) as pool:
+        pending = {}
+        while True:
+            for key in keys:
+                pending[pool.submit(_render_to_file, key, out_dir)] = key
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    seconds, size = future.result()
+                except Exception:
+                    logger.exception("Failed to render report for %s taken at %s", *key)
+                    yield key, None, 0
+                else:
+                    yield key, seconds, size
+
+
+def render_reports_bulk(out_dir: str, db_path: str = DEFAULT_DB_PATH, since: int = 0,
+                        workers: Optional[int] = None) -> Dict[str, float]:
+    """
+    Render every stored report taken at or after `since` into out_dir
+
+    Returns:
+        Summary with the rendered and failed report counts, wall-clock seconds
+        and reports per second
+    """
+    store = AssessmentStore(db_path)
+    start = time.perf_counter()
+    count = failed = 0
+    for _, seconds, _ in render_pool(store.iter_report_keys(since), out_dir, db_path, workers):
+        if seconds is None:
+            failed += 1
+        else:
+            count += 1
+    elapsed = time.perf_counter() - start
+    store.close()
+    return {'reports': count, 'failed': failed, 'seconds': elapsed,
+            'reports_per_second': count / elapsed if elapsed else 0.0}
+
+
+def _synthetic_submission(index: int) -> Tuple[Dict[str, Any], Dict[str, Any], str, List[Dict[str, Any]]]:
+    """Assessment data, scores, AI analysis and opportunities for benchmark runs"""
+    rng = random.Random(index)
+    scores: Dict[str, Any] = {key: rng.uniform(20, 95) for key in DOMAIN_COLUMNS}
+    scores['subcategories'] = {key: rng.uniform(10, 100) for key in SUBCATEGORY_COLUMNS}
+    assessment_data = {'email': f"benchmark{index}@example.com", 'first_name': "Benchmark", 'last_name': str(index)}
+    section = (
+        "## {0}. Optimization Focus\n"
+        "Your results show **real upgrade potential** in this area. Small, consistent changes compound "
+        "into dangerous results when they are stacked on top of each other week after week.\n"
+        "- Build a daily protocol and track it\n"
+        "- Review progress every Sunday\n"
+        "- Use AI tools to automate the busywork\n"
+    )
+    ai_analysis = "\n".join(section.format(number) for number in range(1, 13))
+    opportunities = [
+        {'label': "Sleep quality", 'domain': 'biological', 'current': "Fair", 'suggested': "Good",
+         'domain_gain': 4.2, 'overall_gain': 1.4},
+        {'label': "Savings rate", 'domain': 'financial', 'current': "5-10%", 'suggested': "10-15%",
+         'domain_gain': 3.0, 'overall_gain': 1.0}
+    ]
+    return assessment_data, scores, ai_analysis, opportunities
+
+
+def run_benchmark(reports: int = 200, workers: Optional[int] = None) -> Dict[str, float]:
+    """
+    Measure per-report render time on one template and pool throughput
+
+    Renders `reports` synthetic submissions from a temporary database, first
+    sequentially to time individual renders, then through the worker pool.
+    """
+    business_profile = {
+        "business_name": "DrewIs.online",
+        "coach_name": "Drew",
+        "website": "https://drewis.online",
+        "email": "drew@drewis.online",
+        "phone": "+1-503-855-6181",
+        "brand_message": "You're not broken. You're upgrading. It's Time to get dangerous!",
+        "calendar_link": "https://calendly.com/drew-drewis/product-q-a-session"
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, "benchmark.db")
+        store = AssessmentStore(db_path)
+        for index in range(reports):
+            assessment_data, scores, ai_analysis, opportunities = _synthetic_submission(index)
+            taken_at = store.save_submission(assessment_data, scores, taken_at=index)
+            store.save_report_details(assessment_data, taken_at, ai_analysis, opportunities, business_profile)
+
+        template = ReportTemplate()
+        render_times = []
+        for email, taken_at in store.iter_report_keys():
+            submission = store.load_submission(email, taken_at)
+            start = time.perf_counter()
+            template.render(submission)
+            render_times.append(time.perf_counter() - start)
+        store.close()
+
+        start = time.perf_counter()
+        keys = ((f"benchmark{index}@example.com", index) for index in range(reports))
+        pool_bytes = [size for _, seconds, size in render_pool(keys, os.path.join(work_dir, "reports"), db_path, workers)
+                      if seconds is not None]
+        pool_seconds = time.perf_counter() - start
+
+    render_times.sort()
+    return {
+        'reports': reports,
+        'render_ms_mean': statistics.mean(render_times) * 1000,
+        'render_ms_p50': render_times[len(render_times) // 2] * 1000,
+        'render_ms_p95': render_times[min(len(render_times) - 1, int(len(render_times) * 0.95))] * 1000,
+        'sequential_reports_per_second': len(render_times) / sum(render_times),
+        'pool_reports_per_second': len(pool_bytes) / pool_seconds,
+        'mean_pdf_kb': statistics.mean(pool_bytes) / 1024
+    }
+
+
+def main():
+    """Command line entry point for bulk rendering and benchmarking"""
+    parser = argparse.ArgumentParser(description="Render Human 2.0 Complete Reports to PDF")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bulk = commands.add_parser('bulk', help="Render every stored report into a directory")
+    bulk.add_argument('out_dir')
+    bulk.add_argument('--db', default=DEFAULT_DB_PATH, help="Assessment database path")
+    bulk.add_argument('--since', type=int, default=0, help="Only reports taken at or after this Unix timestamp")
+    bulk.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+
+    benchmark = commands.add_parser('benchmark', help="Measure render time and throughput")
+    benchmark.add_argument('--reports', type=int, default=200)
+    benchmark.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == 'bulk':
+        summary = render_reports_bulk(args.out_dir, args.db, args.since, args.workers)
+    else:
+        summary = run_benchmark(args.reports, args.workers)
+
+    for key, value in summary.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
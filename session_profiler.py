@@ -0,0 +1,94 @@
+# Human 2.0 Assessment Bot - Session Profiler
+# Created for DrewIs.. UpLevel Movement Business
+# Opt-in sampling profiler that writes one flame graph profile per rerun
+
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+PROFILE_DIR = os.environ.get("HUMAN20_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("HUMAN20_PROFILE_KEEP", "200"))
+PROFILE_INTERVAL_MS = float(os.environ.get("HUMAN20_PROFILE_INTERVAL_MS", "5"))
+
+
+class SessionProfiler:
+    """
+    Sampling profiler for one rerun of a step handler.
+
+    Used as a context manager around the handler call. A background thread
+    samples the calling thread's stack every few milliseconds, and on exit the
+    samples are written in collapsed-stack format ("frame;frame;frame count"),
+    which flamegraph.pl, speedscope and similar tools read directly. Only the
+    newest PROFILE_KEEP profiles are kept in the directory.
+    """
+
+    def __init__(self, step: str, session_id: str, profile_dir: str = PROFILE_DIR,
+                 keep: int = PROFILE_KEEP, interval_ms: float = PROFILE_INTERVAL_MS):
+        """
+        Set up a profile for one rerun
+
+        Args:
+            step: Assessment step being rendered, used in the file name
+            session_id: Identifies the user session, used in the file name
+            profile_dir: Directory the profiles are written to
+            keep: Number of most recent profiles to keep
+            interval_ms: Sampling interval in milliseconds
+        """
+        self.step = step
+        self.session_id = re.sub(r"[^A-Za-z0-9-]", "_", session_id)
+        self.profile_dir = profile_dir
+        self.keep = keep
+        self.interval = interval_ms / 1000
+        self.samples: Dict[str, int] = {}
+        self.path: Optional[str] = None
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._root = sys._getframe(1)
+        self._sampler = threading.Thread(target=self._sample, name="human20-profiler", daemon=True)
+        self._started = time.perf_counter()
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Also reached when the handler calls st.rerun(), which raises to end the run
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        self._stop.set()
+        self._sampler.join()
+        self.write(elapsed_ms)
+        return False
+
+    def _sample(self):
+        """Record the profiled thread's stack until stopped"""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                if frame is self._root:
+                    break
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def write(self, elapsed_ms: float):
+        """Write the collected samples and drop the oldest profiles beyond the limit"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        file_name = f"{int(time.time() * 1000)}_{self.session_id}_{self.step}_{elapsed_ms:.0f}ms.folded"
+        self.path = os.path.join(self.profile_dir, file_name)
+        with open(self.path, "w") as profile_file:
+            for stack, count in self.samples.items():
+                profile_file.write(f"{stack} {count}\n")
+
+        profiles = sorted(name for name in os.listdir(self.profile_dir) if name.endswith(".folded"))
+        for name in profiles[:max(0, len(profiles) - self.keep)]:
+            try:
+                os.remove(os.path.join(self.profile_dir, name))
+            except FileNotFoundError:
+                pass  # Already rotated away by another session